@@ -0,0 +1,34 @@
+import streamlit as st
+from utils import TAX_BRACKETS, CURRENCY_RATES, RETIREMENT_LIMITS, calculate_tax
+
+# Widget options derived from the reference data, built once per process
+
+@st.cache_resource
+def country_options() -> tuple:
+    """
+    Countries with tax bracket data
+    """
+    return tuple(TAX_BRACKETS)
+
+@st.cache_resource
+def currency_options() -> tuple:
+    """
+    Currencies available for conversion
+    """
+    return tuple(CURRENCY_RATES)
+
+@st.cache_resource
+def retirement_account_options() -> tuple:
+    """
+    Retirement account types with contribution limits
+    """
+    return tuple(RETIREMENT_LIMITS)
+
+@st.cache_resource
+def warm_tax_kernel() -> bool:
+    """
+    Compile the tax kernel once per process before the first real calculation
+    """
+    for country in TAX_BRACKETS:
+        calculate_tax(0.0, country)
+    return True
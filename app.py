@@ -1,24 +1,21 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from plotly.subplots import make_subplots
+from datetime import datetime
 from utils import (
-    TAX_BRACKETS, COMMON_DEDUCTIONS, RETIREMENT_LIMITS, CURRENCY_RATES,
-    calculate_tax, calculate_quarterly_tax, get_tax_optimization_tips,
-    calculate_monthly_goal, calculate_retirement_impact, adjust_for_inflation,
-    convert_currency
-)
-
-# Page config and styling
-st.set_page_config(
-    page_title="Freelancers' Tax & Income Estimator",
-    page_icon="💰",
-    layout="wide"
+    FIXED_DEDUCTIONS, PERCENTAGE_DEDUCTIONS, RETIREMENT_LIMITS,
+    FREQ_MULTIPLIER, INFLATION_RATE, QUARTER_LABELS, QUARTER_COLUMNS,
+    FullReport, compute_full_report, calculate_quarterly_tax, get_tax_optimization_tips,
+    calculate_retirement_impact, adjust_for_inflation, growth_factors,
+    get_rate
 )
+from _cached import country_options, currency_options, retirement_account_options, warm_tax_kernel
 
 # Custom CSS with enhanced styling
-st.markdown("""
+_CSS = """
     <style>
     #MainMenu {visibility: hidden;}
     footer {visibility: hidden;}
@@ -53,7 +50,165 @@ st.markdown("""
         font-weight: bold;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+# Row labels for the financial summary tables
+CATEGORIES = pd.Index(
+    ('Total Income', 'Total Expenses', 'Taxable Income', 'Tax Amount', 'Net Profit'),
+    name='Category'
+)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_report(country: str, income: float, goal: float) -> FullReport:
+    """
+    Memoized tax and income goal report keyed on country, taxable income and annual goal
+    """
+    return compute_full_report(income, goal, 0.25, country)  # Assuming 25% tax rate for the goal
+
+
+def format_amounts(amounts: np.ndarray) -> list:
+    """
+    Format amounts as dollar strings for display tables
+    """
+    return [f"${amount:,.2f}" for amount in amounts]
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_quarterly_tax(quarterly_amount: float, year: int) -> pd.DataFrame:
+    """
+    Memoized quarterly tax schedule display table keyed on the quarterly payment and the
+    current year (so due dates roll over on January 1st)
+    """
+    schedule = calculate_quarterly_tax(quarterly_amount, year)
+    return pd.DataFrame(
+        dict(zip(QUARTER_COLUMNS, (schedule.due_dates, format_amounts(schedule.amounts)))),
+        index=pd.Index(QUARTER_LABELS)
+    )
+
+
+@st.cache_resource(max_entries=2)
+def _months_index(month_key: str) -> pd.DatetimeIndex:
+    """
+    Month-end dates for the 12 months starting at month_key (first day of a month)
+    """
+    return pd.date_range(start=month_key, periods=12, freq=pd.offsets.MonthEnd())
+
+
+@st.cache_data(show_spinner=False, max_entries=64, ttl=3600)
+def _trend_df(monthly_total: float, month_key: str) -> pd.DataFrame:
+    """
+    Flat monthly income projection for the next 12 months
+    """
+    return pd.DataFrame({
+        'Month': _months_index(month_key),
+        'Income': np.full(12, monthly_total)
+    })
+
+
+@st.cache_data(show_spinner=False, max_entries=64, ttl=3600)
+def make_trend_fig(monthly_total: float, month_key: str) -> go.Figure:
+    """
+    Build the projected monthly income line chart
+    """
+    monthly_income = _trend_df(monthly_total, month_key)
+    
+    fig_trend = px.line(
+        monthly_income,
+        x='Month',
+        y='Income',
+        title='Projected Monthly Income'
+    )
+    fig_trend.update_layout(
+        xaxis_title="Month",
+        yaxis_title="Income",
+        hovermode='x unified'
+    )
+    return fig_trend
+
+
+@st.cache_data(show_spinner=False, max_entries=64, ttl=3600)
+def make_summary_fig(
+    total_income: float,
+    total_expenses: float,
+    net_profit: float,
+    tax_amount: float,
+    deduction_names: tuple,
+    deduction_values: tuple
+) -> go.Figure:
+    """
+    Build the income vs expenses, tax distribution and deductions charts as one figure
+    """
+    specs = [{"type": "xy"}, {"type": "domain"}]
+    titles = ['Income vs Expenses', 'Tax Distribution']
+    if deduction_values:
+        specs.append({"type": "domain"})
+        titles.append('Deductions Breakdown')
+    
+    fig = make_subplots(rows=1, cols=len(specs), specs=[specs], subplot_titles=titles)
+    fig.add_trace(
+        go.Bar(name='Income', x=['Total'], y=[total_income], marker_color='#00cc96'),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Bar(name='Expenses', x=['Total'], y=[total_expenses], marker_color='#ef553b'),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Pie(
+            values=[net_profit, tax_amount],
+            labels=['Net Income', 'Tax'],
+            marker=dict(colors=['#00cc96', '#ef553b'])
+        ),
+        row=1, col=2
+    )
+    if deduction_values:
+        fig.add_trace(
+            go.Pie(
+                values=list(deduction_values),
+                labels=list(deduction_names),
+                marker=dict(colors=px.colors.qualitative.Set3)
+            ),
+            row=1, col=3
+        )
+    fig.update_layout(
+        barmode='group',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False, max_entries=64, ttl=3600)
+def make_inflation_fig(net_income: float, inflation_years: int) -> go.Figure:
+    """
+    Build the purchasing power over time line chart
+    """
+    years = np.arange(inflation_years + 1)
+    values = net_income * growth_factors(INFLATION_RATE, inflation_years)
+    
+    fig_inflation = px.line(
+        x=years,
+        y=values,
+        title='Purchasing Power Over Time',
+        labels={'x': 'Years', 'y': 'Value'}
+    )
+    fig_inflation.update_layout(
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_inflation
+
+
+# Page config and styling
+st.set_page_config(
+    page_title="Freelancers' Tax & Income Estimator",
+    page_icon="💰",
+    layout="wide"
+)
+warm_tax_kernel()
+
+# Inject custom CSS (must be re-emitted on every rerun)
+st.markdown(_CSS, unsafe_allow_html=True)
 
 # Title and description
 st.title("💰 Freelancers' Tax & Income Estimator")
@@ -67,8 +222,8 @@ with st.sidebar:
     st.header("⚙️ Settings")
     
     # Country and Currency Selection
-    country = st.selectbox("🌍 Select Country", list(TAX_BRACKETS.keys()))
-    currency = st.selectbox("💱 Select Currency", list(CURRENCY_RATES.keys()))
+    country = st.selectbox("🌍 Select Country", country_options())
+    currency = st.selectbox("💱 Select Currency", currency_options())
     
     # Income Goal Setting
     st.header("🎯 Income Goals")
@@ -76,7 +231,7 @@ with st.sidebar:
     
     # Retirement Planning
     st.header("🏦 Retirement Planning")
-    retirement_account = st.selectbox("Account Type", list(RETIREMENT_LIMITS.keys()))
+    retirement_account = st.selectbox("Account Type", retirement_account_options())
     retirement_contribution = st.slider(
         "Annual Contribution",
         0,
@@ -99,100 +254,79 @@ with tab1:
     
     with col1:
         st.header("Income Sources")
-        num_sources = st.number_input("Number of Income Sources", min_value=1, max_value=5, value=1)
-        
-        income_sources = []
-        total_income_monthly = []  # For trend visualization
-        
-        for i in range(num_sources):
-            with st.expander(f"Income Source {i+1}", expanded=i==0):
-                source_name = st.text_input(f"Source Name {i+1}", key=f"source_name_{i}")
-                amount = st.number_input(f"Amount {i+1}", min_value=0.0, key=f"amount_{i}")
-                frequency = st.selectbox(
+        income_df = st.data_editor(
+            st.session_state.setdefault(
+                "income_df",
+                pd.DataFrame({"name": [""], "amount": [0.0], "frequency": ["Monthly"]})
+            ),
+            num_rows="dynamic",
+            key="income_editor",
+            use_container_width=True,
+            column_config={
+                "name": st.column_config.TextColumn("Source Name"),
+                "amount": st.column_config.NumberColumn("Amount", min_value=0.0, format="%.2f"),
+                "frequency": st.column_config.SelectboxColumn(
                     "Payment Frequency",
-                    ["Monthly", "One-time", "Weekly", "Bi-weekly"],
-                    key=f"freq_{i}"
+                    options=list(FREQ_MULTIPLIER)
                 )
-                
-                # Calculate monthly amount for trend visualization
-                monthly_amount = amount
-                if frequency == "Weekly":
-                    monthly_amount *= 4.33
-                elif frequency == "Bi-weekly":
-                    monthly_amount *= 2.17
-                elif frequency == "One-time":
-                    monthly_amount /= 12
-                    
-                income_sources.append({
-                    "name": source_name,
-                    "amount": amount,
-                    "frequency": frequency,
-                    "monthly_amount": monthly_amount
-                })
-                total_income_monthly.append(monthly_amount)
+            }
+        )
+        # Rows added in the editor start out empty
+        income_df = income_df.fillna({"amount": 0.0, "frequency": "Monthly"})
+        
+        # Calculate monthly amounts for trend visualization
+        multipliers = income_df["frequency"].map(FREQ_MULTIPLIER).to_numpy(dtype=np.float64)
+        monthly_amounts = income_df["amount"].to_numpy(dtype=np.float64) * multipliers
     
     with col2:
         st.header("Business Expenses")
-        num_expenses = st.number_input("Number of Expense Categories", min_value=1, max_value=5, value=1)
-        
-        expenses = []
-        for i in range(num_expenses):
-            with st.expander(f"Expense Category {i+1}", expanded=i==0):
-                expense_name = st.text_input(f"Category Name {i+1}", key=f"expense_name_{i}")
-                amount = st.number_input(f"Amount {i+1}", min_value=0.0, key=f"expense_amount_{i}")
-                is_recurring = st.checkbox("Recurring Monthly Expense", key=f"recurring_{i}")
-                expenses.append({
-                    "name": expense_name,
-                    "amount": amount,
-                    "recurring": is_recurring
-                })
+        expense_df = st.data_editor(
+            st.session_state.setdefault(
+                "expense_df",
+                pd.DataFrame({"name": [""], "amount": [0.0], "recurring": [False]})
+            ),
+            num_rows="dynamic",
+            key="expense_editor",
+            use_container_width=True,
+            column_config={
+                "name": st.column_config.TextColumn("Category Name"),
+                "amount": st.column_config.NumberColumn("Amount", min_value=0.0, format="%.2f"),
+                "recurring": st.column_config.CheckboxColumn("Recurring Monthly Expense")
+            }
+        )
+        expense_df = expense_df.fillna({"amount": 0.0, "recurring": False})
 
     # Income Trend Visualization
     st.subheader("📈 Income Trend Projection")
-    months = pd.date_range(start=datetime.now(), periods=12, freq='M')
-    monthly_income = pd.DataFrame({
-        'Month': months,
-        'Income': [sum(total_income_monthly)] * 12
-    })
-    
-    fig_trend = px.line(
-        monthly_income,
-        x='Month',
-        y='Income',
-        title='Projected Monthly Income'
-    )
-    fig_trend.update_layout(
-        xaxis_title="Month",
-        yaxis_title="Income",
-        hovermode='x unified'
-    )
+    monthly_income_value = float(monthly_amounts.sum())
+    fig_trend = make_trend_fig(monthly_income_value, datetime.now().strftime('%Y-%m-01'))
     st.plotly_chart(fig_trend, use_container_width=True)
 
+# Calculate totals once and reuse them across tabs and the summary
+income_amounts = income_df["amount"].to_numpy(dtype=np.float64)
+expense_amounts = expense_df["amount"].to_numpy(dtype=np.float64)
+total_income = float(income_amounts.sum())
+total_expenses = float(expense_amounts.sum())
+taxable_income = total_income - total_expenses
+report = cached_report(country, taxable_income, annual_goal)
+tax_amount = report.tax
+net_profit = taxable_income - tax_amount
+
 with tab2:
     st.header("Tax Planning")
     
-    # Calculate totals
-    total_income = sum(source["amount"] for source in income_sources)
-    total_expenses = sum(expense["amount"] for expense in expenses)
-    
     # Quarterly Tax Estimates
     st.subheader("📅 Quarterly Tax Estimates")
-    quarterly_taxes = calculate_quarterly_tax(total_income, calculate_tax(total_income - total_expenses, TAX_BRACKETS[country]))
+    quarterly_df = cached_quarterly_tax(report.quarterly_amount, datetime.now().year)
     
     # Display quarterly tax table with improved styling
-    quarterly_df = pd.DataFrame.from_dict(quarterly_taxes, orient='index')
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    st.dataframe(
-        quarterly_df.style.format({
-            'amount': '${:,.2f}'
-        }),
-        use_container_width=True
-    )
+    st.dataframe(quarterly_df, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Tax Optimization Tips
     st.subheader("💡 Tax Optimization Tips")
-    tips = get_tax_optimization_tips(total_income, expenses, {})
+    tips = get_tax_optimization_tips(total_income, expense_amounts, {})
     for tip in tips:
         st.markdown(f'<div class="tax-tip">{tip}</div>', unsafe_allow_html=True)
 
@@ -201,29 +335,25 @@ with tab3:
     
     # Common deductions checklist with improved UI
     st.subheader("Common Freelancer Deductions")
-    selected_deductions = {}
-    
-    # Group deductions by type
-    fixed_deductions = {k: v for k, v in COMMON_DEDUCTIONS.items() if v["type"] == "fixed"}
-    percentage_deductions = {k: v for k, v in COMMON_DEDUCTIONS.items() if v["type"] == "percentage"}
+    deduction_inputs = []
     
     # Display percentage-based deductions
     st.markdown("### Percentage-Based Deductions")
-    for deduction, details in percentage_deductions.items():
+    for deduction, details in PERCENTAGE_DEDUCTIONS.items():
         with st.expander(deduction, expanded=False):
             st.markdown(f"_{details['description']}_")
             value = st.slider(f"{deduction} Percentage", 0, 100, 0, key=f"deduction_{deduction}")
-            if value > 0:
-                selected_deductions[deduction] = value
+            deduction_inputs.append((deduction, value))
     
     # Display fixed amount deductions
     st.markdown("### Fixed Amount Deductions")
-    for deduction, details in fixed_deductions.items():
+    for deduction, details in FIXED_DEDUCTIONS.items():
         with st.expander(deduction, expanded=False):
             st.markdown(f"_{details['description']}_")
             value = st.number_input(f"{deduction} Amount", min_value=0.0, key=f"deduction_{deduction}")
-            if value > 0:
-                selected_deductions[deduction] = value
+            deduction_inputs.append((deduction, value))
+    
+    selected_deductions = {deduction: value for deduction, value in deduction_inputs if value > 0}
 
 with tab4:
     st.header("Financial Insights")
@@ -232,17 +362,15 @@ with tab4:
     
     with col1:
         st.subheader("🎯 Income Goal Breakdown")
-        goal_calculations = calculate_monthly_goal(annual_goal, 0.25)  # Assuming 25% tax rate
-        
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric(
             "Monthly Target (Before Tax)",
-            f"${goal_calculations['monthly_before_tax']:,.2f}",
+            f"${report.monthly_before_tax:,.2f}",
             help="Amount you need to earn monthly before taxes"
         )
         st.metric(
             "Monthly Target (After Tax)",
-            f"${goal_calculations['monthly_after_tax']:,.2f}",
+            f"${report.monthly_after_tax:,.2f}",
             help="Net amount you'll receive after taxes"
         )
         st.markdown('</div>', unsafe_allow_html=True)
@@ -254,108 +382,57 @@ with tab4:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric(
             "Projected Retirement Savings",
-            f"${retirement_impact['future_value']:,.2f}",
-            f"+${retirement_impact['total_contribution']:,.2f} total contribution"
+            f"${retirement_impact.future_value:,.2f}",
+            f"+${retirement_impact.total_contribution:,.2f} total contribution"
         )
         st.metric(
             "Annual Tax Savings",
-            f"${retirement_impact['tax_savings']:,.2f}",
+            f"${retirement_impact.tax_savings:,.2f}",
             help="Estimated tax savings from retirement contributions"
         )
         st.markdown('</div>', unsafe_allow_html=True)
 
+# Nothing to summarize until some income or expenses are entered
+if total_income == 0 and total_expenses == 0:
+    st.info("Enter your income and expenses to see the financial summary and insights")
+    st.stop()
+
 # Financial Summary
 st.header("📊 Financial Summary")
 
-# Create three columns for the charts
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    # Income vs Expenses Bar Chart
-    fig1 = go.Figure(data=[
-        go.Bar(
-            name='Income',
-            x=['Total'],
-            y=[total_income],
-            marker_color='#00cc96'
-        ),
-        go.Bar(
-            name='Expenses',
-            x=['Total'],
-            y=[total_expenses],
-            marker_color='#ef553b'
-        )
-    ])
-    fig1.update_layout(
-        title='Income vs Expenses',
-        barmode='group',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
-    st.plotly_chart(fig1, use_container_width=True)
-
-with col2:
-    # Tax Distribution Pie Chart
-    taxable_income = total_income - total_expenses
-    tax_amount = calculate_tax(taxable_income, TAX_BRACKETS[country])
-    fig2 = px.pie(
-        values=[taxable_income - tax_amount, tax_amount],
-        names=['Net Income', 'Tax'],
-        title='Tax Distribution',
-        color_discrete_sequence=['#00cc96', '#ef553b']
-    )
-    st.plotly_chart(fig2, use_container_width=True)
-
-with col3:
-    # Deductions Breakdown
-    deduction_values = list(selected_deductions.values())
-    deduction_names = list(selected_deductions.keys())
-    if deduction_values:
-        fig3 = px.pie(
-            values=deduction_values,
-            names=deduction_names,
-            title='Deductions Breakdown',
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        st.plotly_chart(fig3, use_container_width=True)
-    else:
-        st.info("Add deductions to see the breakdown")
+# Income vs Expenses, Tax Distribution and Deductions Breakdown in one figure
+deduction_values = tuple(selected_deductions.values())
+deduction_names = tuple(selected_deductions.keys())
+fig_summary = make_summary_fig(
+    total_income, total_expenses, net_profit, tax_amount, deduction_names, deduction_values
+)
+st.plotly_chart(fig_summary, use_container_width=True)
+if not deduction_values:
+    st.info("Add deductions to see the breakdown")
 
 # Summary Tables
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("💰 Financial Summary (USD)")
-    summary_data = {
-        'Category': ['Total Income', 'Total Expenses', 'Taxable Income', 'Tax Amount', 'Net Profit'],
-        'Amount': [
-            total_income,
-            total_expenses,
-            taxable_income,
-            tax_amount,
-            taxable_income - tax_amount
-        ]
-    }
-    summary_df = pd.DataFrame(summary_data)
-    st.dataframe(
-        summary_df.style.format({
-            'Amount': '${:,.2f}'
-        }),
-        use_container_width=True
-    )
+    summary_amounts = np.array([
+        total_income,
+        total_expenses,
+        taxable_income,
+        tax_amount,
+        net_profit
+    ], dtype=np.float64)
+    summary_df = pd.DataFrame({'Amount': format_amounts(summary_amounts)}, index=CATEGORIES)
+    st.dataframe(summary_df, use_container_width=True)
 
 with col2:
     if currency != "USD":
         st.subheader(f"💱 Financial Summary ({currency})")
-        converted_summary = summary_df.copy()
-        converted_summary['Amount'] = converted_summary['Amount'].apply(
-            lambda x: convert_currency(x, "USD", currency)
-        )
-        st.dataframe(
-            converted_summary.style.format({
-                'Amount': '${:,.2f}'
-            }),
-            use_container_width=True
+        converted_summary = pd.DataFrame(
+            {'Amount': format_amounts(summary_amounts * get_rate("USD", currency))},
+            index=CATEGORIES
         )
+        st.dataframe(converted_summary, use_container_width=True)
 
 # Inflation Impact
 st.header("📈 Inflation Impact")
@@ -363,30 +440,18 @@ col1, col2 = st.columns([1, 2])
 
 with col1:
     inflation_years = st.slider("Project inflation impact (years)", 1, 10, 5)
-    inflation_adjusted = adjust_for_inflation(taxable_income - tax_amount, inflation_years)
+    inflation_adjusted = adjust_for_inflation(net_profit, inflation_years)
     
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
     st.metric(
         f"Purchasing Power in {inflation_years} years",
         f"${inflation_adjusted:,.2f}",
-        f"${inflation_adjusted - (taxable_income - tax_amount):,.2f}",
+        f"${inflation_adjusted - net_profit:,.2f}",
         help="Projected value adjusted for inflation"
     )
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col2:
     # Inflation trend visualization
-    years = range(0, inflation_years + 1)
-    values = [adjust_for_inflation(taxable_income - tax_amount, year) for year in years]
-    
-    fig_inflation = px.line(
-        x=years,
-        y=values,
-        title='Purchasing Power Over Time',
-        labels={'x': 'Years', 'y': 'Value'}
-    )
-    fig_inflation.update_layout(
-        showlegend=False,
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    fig_inflation = make_inflation_fig(net_profit, inflation_years)
     st.plotly_chart(fig_inflation, use_container_width=True) 
@@ -1,25 +1,48 @@
-import datetime
-import pandas as pd
+import json
+import os
+import time
+from functools import lru_cache, wraps
+from pathlib import Path
+from types import MappingProxyType
 import numpy as np
-import requests
-from typing import Dict, Union
-import streamlit as st
+from typing import Dict, NamedTuple, Optional
 
-# Tax bracket data
-TAX_BRACKETS = {
-    "United States": [
+# streamlit and requests are imported inside the functions that need them so
+# the calculation helpers can be used without loading the UI/HTTP stack
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to NumPy
+    njit = None
+
+# Tax bracket data (read-only)
+TAX_BRACKETS = MappingProxyType({
+    "United States": (
         (0, 11000, 0.10),
         (11001, 44725, 0.12),
         (44726, 95375, 0.22),
         (95376, 182100, 0.24),
         (182101, 231250, 0.32),
         (231251, 578125, 0.35),
-        (578126, float('inf'), 0.37)
-    ]
-}
+        (578126, 1e18, 0.37)  # finite sentinel instead of inf for the open top bracket
+    )
+})
 
-# Common deductions for freelancers
-COMMON_DEDUCTIONS = {
+def _bracket_arrays(brackets: tuple) -> tuple:
+    """
+    Split (lower, upper, rate) bracket tuples into (lowers, widths, rates, base_tax) float arrays,
+    where base_tax[i] is the tax owed on all brackets below bracket i
+    """
+    lowers, uppers, rates = (np.array(column, dtype=np.float64) for column in zip(*brackets))
+    widths = uppers - lowers
+    base_tax = np.concatenate(([0.0], np.cumsum(widths[:-1] * rates[:-1])))
+    return lowers, widths, rates, base_tax
+
+# Bracket arrays per country, built once at import
+TAX_BRACKET_ARRAYS = {country: _bracket_arrays(brackets) for country, brackets in TAX_BRACKETS.items()}
+
+# Common deductions for freelancers (read-only)
+COMMON_DEDUCTIONS = MappingProxyType({
     "Home Office": {"description": "Portion of home used for business", "type": "percentage"},
     "Internet & Phone": {"description": "Business portion of utilities", "type": "percentage"},
     "Software & Subscriptions": {"description": "Business software and tools", "type": "fixed"},
@@ -30,91 +53,216 @@ COMMON_DEDUCTIONS = {
     "Retirement Contributions": {"description": "SEP IRA, Solo 401(k)", "type": "fixed"},
     "Professional Services": {"description": "Legal and accounting fees", "type": "fixed"},
     "Marketing & Advertising": {"description": "Promotion and advertising costs", "type": "fixed"}
-}
+})
+
+# Deductions grouped by type, split once at import
+FIXED_DEDUCTIONS = MappingProxyType({k: v for k, v in COMMON_DEDUCTIONS.items() if v["type"] == "fixed"})
+PERCENTAGE_DEDUCTIONS = MappingProxyType({k: v for k, v in COMMON_DEDUCTIONS.items() if v["type"] == "percentage"})
 
-# Retirement account limits (2024)
-RETIREMENT_LIMITS = {
+# Retirement account limits (2024, read-only)
+RETIREMENT_LIMITS = MappingProxyType({
     "Traditional IRA": 7000,
     "Roth IRA": 7000,
     "SEP IRA": 69000,
     "Solo 401(k)": 69000
+})
+
+# Fallback currency rates (used when API is unavailable, read-only)
+CURRENCY_RATES = MappingProxyType({
+    "USD": 1.0,
+    "EUR": 0.92,
+    "GBP": 0.79,
+    "CAD": 1.35,
+    "AUD": 1.52,
+    "JPY": 151.50,
+    "CHF": 0.90,
+    "NZD": 1.65,
+    "CNY": 7.23,
+    "INR": 83.34
+})
+
+# Multipliers converting a payment at each frequency to a monthly amount
+FREQ_MULTIPLIER = {
+    "Monthly": 1.0,
+    "One-time": 1.0 / 12.0,
+    "Weekly": 4.33,
+    "Bi-weekly": 2.17
 }
 
-def calculate_tax(income: float, brackets: list) -> float:
+# Default annual inflation rate used for purchasing power projections
+INFLATION_RATE = 0.03
+
+# Precomputed (1 + rate) ** years growth factors for common inflation and return rates
+_LUT_RATES = (0.02, 0.025, 0.03, 0.035, 0.04, 0.05, 0.06, 0.07, 0.08)
+_LUT_RATE_INDEX = {rate: i for i, rate in enumerate(_LUT_RATES)}
+# Built with Python's ** so lookups match the (1 + rate) ** years fallback bit for bit
+_GROWTH_LUT = np.array([[(1 + rate) ** years for years in range(51)] for rate in _LUT_RATES])
+
+def _growth_factor(rate: float, years: int) -> float:
     """
-    Calculate tax based on income and tax brackets
+    Look up (1 + rate) ** years, computing it only for rates or years outside the table
     """
-    tax = 0
-    for lower, upper, rate in brackets:
-        if income > lower:
-            taxable_amount = min(income - lower, upper - lower)
-            tax += taxable_amount * rate
-    return tax
+    i = _LUT_RATE_INDEX.get(rate)
+    if i is not None and 0 <= years < _GROWTH_LUT.shape[1] and years == int(years):
+        return float(_GROWTH_LUT[i, int(years)])
+    return (1 + rate) ** years
 
-def calculate_quarterly_tax(annual_income: float, tax_amount: float) -> dict:
+def growth_factors(rate: float, years: int) -> np.ndarray:
     """
-    Calculate quarterly tax payments and due dates
+    Growth factors (1 + rate) ** y for y = 0..years, matching _growth_factor element for element
     """
-    quarterly_amount = tax_amount / 4
-    current_year = datetime.datetime.now().year
-    
-    quarters = {
-        "Q1": {"due_date": f"April 15, {current_year}", "amount": quarterly_amount},
-        "Q2": {"due_date": f"June 15, {current_year}", "amount": quarterly_amount},
-        "Q3": {"due_date": f"September 15, {current_year}", "amount": quarterly_amount},
-        "Q4": {"due_date": f"January 15, {current_year + 1}", "amount": quarterly_amount}
-    }
-    return quarters
+    i = _LUT_RATE_INDEX.get(rate)
+    if i is not None and 0 <= years < _GROWTH_LUT.shape[1]:
+        return _GROWTH_LUT[i, :years + 1].copy()
+    return np.array([(1 + rate) ** y for y in range(years + 1)])
+
+def _tax_kernel(income, lowers, widths, rates, base_tax):
+    # Highest bracket whose lower bound is strictly below income
+    i = np.searchsorted(lowers, income) - 1
+    if i < 0:
+        return 0.0
+    return base_tax[i] + min(income - lowers[i], widths[i]) * rates[i]
+
+if njit is not None:
+    _tax_kernel = njit(cache=True)(_tax_kernel)
+
+    @njit(cache=True, parallel=True)
+    def _tax_batch_kernel(incomes, lowers, widths, rates, base_tax):
+        taxes = np.empty(incomes.size)
+        for k in prange(incomes.size):
+            taxes[k] = _tax_kernel(incomes[k], lowers, widths, rates, base_tax)
+        return taxes
+else:
+    def _tax_batch_kernel(incomes, lowers, widths, rates, base_tax):
+        # Branchless: amount of each income falling in each bracket, weighted by rate
+        taxable = np.clip(incomes[:, None] - lowers, 0.0, widths)
+        return (taxable * rates).sum(axis=1)
 
-def get_tax_optimization_tips(income: float, expenses: dict, deductions: dict) -> list:
+def calculate_tax(income: float, country: str = "United States") -> float:
+    """
+    Calculate tax based on income and the country's tax brackets
+    """
+    # Quantize to cents so repeated slider/input values share cache entries
+    return _calculate_tax_cached(float(np.round(income, 2)), country)
+
+@lru_cache(maxsize=2048)
+def _calculate_tax_cached(income: float, country: str) -> float:
+    return float(_tax_kernel(income, *TAX_BRACKET_ARRAYS[country]))
+
+def calculate_tax_batch(incomes: np.ndarray, country: str = "United States") -> np.ndarray:
+    """
+    Calculate tax for an array of incomes using the country's tax brackets
+    """
+    # Quantized to cents like calculate_tax, so both entry points agree
+    incomes = np.round(np.asarray(incomes, dtype=np.float64), 2)
+    taxes = _tax_batch_kernel(incomes.ravel(), *TAX_BRACKET_ARRAYS[country])
+    return taxes.reshape(incomes.shape)
+
+# Row and column labels for the quarterly tax schedule
+QUARTER_LABELS = ("Q1", "Q2", "Q3", "Q4")
+QUARTER_COLUMNS = ("due_date", "amount")
+
+# Due date templates per quarter; Q4 falls in the following year
+_QUARTER_DUE_TEMPLATES = ("April 15, {y}", "June 15, {y}", "September 15, {y}", "January 15, {y1}")
+
+class QuarterlySchedule(NamedTuple):
+    due_dates: tuple
+    amounts: np.ndarray
+
+def calculate_quarterly_tax(quarterly_amount: float, year: Optional[int] = None) -> QuarterlySchedule:
+    """
+    Quarterly tax payments and due dates for a FullReport's quarterly_amount, aligned with QUARTER_LABELS
+    """
+    # The year is part of the cache key so due dates roll over on January 1st
+    if year is None:
+        year = time.localtime().tm_year
+    return _quarterly_schedule(quarterly_amount, year)
+
+@lru_cache(maxsize=4)
+def _quarters_for_year(year: int) -> tuple:
+    return tuple(template.format(y=year, y1=year + 1) for template in _QUARTER_DUE_TEMPLATES)
+
+@lru_cache(maxsize=1024)
+def _quarterly_schedule(quarterly_amount: float, year: int) -> QuarterlySchedule:
+    amounts = np.full(len(QUARTER_LABELS), quarterly_amount)
+    amounts.flags.writeable = False  # shared between callers through the cache
+    return QuarterlySchedule(_quarters_for_year(year), amounts)
+
+# Bit flags for the deductions that tax tips depend on
+_BIT_RETIREMENT = 1 << 0
+_BIT_HOME_OFFICE = 1 << 1
+_BIT_HEALTH_INSURANCE = 1 << 2
+_BIT_PROFESSIONAL_SERVICES = 1 << 3
+_BIT_PROFESSIONAL_DEVELOPMENT = 1 << 4
+_BIT_MARKETING = 1 << 5
+# Set when expenses are at least 20% of income, suppressing the expense tracking tips
+_BIT_EXPENSES_TRACKED = 1 << 6
+
+_DEDUCTION_BITS = {
+    "Retirement Contributions": _BIT_RETIREMENT,
+    "Home Office": _BIT_HOME_OFFICE,
+    "Health Insurance": _BIT_HEALTH_INSURANCE,
+    "Professional Services": _BIT_PROFESSIONAL_SERVICES,
+    "Professional Development": _BIT_PROFESSIONAL_DEVELOPMENT,
+    "Marketing & Advertising": _BIT_MARKETING
+}
+
+# (bit, message) pairs in display order; a tip is shown unless its bit is set,
+# so a bit of 0 marks a tip that is always shown
+_TIPS_SHARED_HEAD = (
+    (_BIT_HOME_OFFICE, "🏠 If you work from home, you may be eligible for the home office deduction - typically 10-20% of home expenses"),
+    (_BIT_HEALTH_INSURANCE, "🏥 Self-employed individuals can deduct 100% of health insurance premiums for themselves and family"),
+    (_BIT_EXPENSES_TRACKED, "📊 Your expense ratio seems low. Consider tracking all eligible business expenses including:"),
+    (_BIT_EXPENSES_TRACKED, "   • Software subscriptions and tools"),
+    (_BIT_EXPENSES_TRACKED, "   • Professional development and training"),
+    (_BIT_EXPENSES_TRACKED, "   • Office supplies and equipment"),
+)
+
+_TIPS_SHARED_TAIL = (
+    (0, "📅 Remember to make quarterly estimated tax payments to avoid penalties"),
+    (_BIT_PROFESSIONAL_DEVELOPMENT, "📚 Educational expenses related to maintaining or improving your skills are tax-deductible"),
+    (_BIT_MARKETING, "📣 Marketing and advertising costs are fully deductible business expenses"),
+)
+
+_TIPS_LOW_INCOME = (
+    ((_BIT_RETIREMENT, "💡 Consider contributing to a retirement account (Traditional IRA: $7,000 limit) to reduce taxable income"),)
+    + _TIPS_SHARED_HEAD
+    + _TIPS_SHARED_TAIL
+)
+
+_TIPS_HIGH_INCOME = (
+    ((_BIT_RETIREMENT, "💰 High Income Tip: Maximize your retirement contributions with a SEP IRA or Solo 401(k) to reduce taxable income by up to $69,000"),)
+    + _TIPS_SHARED_HEAD
+    + (
+        (0, "💼 Consider forming an S-Corporation to potentially reduce self-employment tax"),
+        (_BIT_PROFESSIONAL_SERVICES, "⚖️ At your income level, consulting with a tax professional could lead to significant savings"),
+    )
+    + _TIPS_SHARED_TAIL
+)
+
+def get_tax_optimization_tips(income: float, expense_amounts: np.ndarray, deductions: dict) -> list:
     """
     Generate personalized tax optimization tips based on user's financial data
     """
-    tips = []
-    total_deductions = sum(deductions.values()) if deductions else 0
-    expense_ratio = sum(expense["amount"] for expense in expenses) / income if income > 0 else 0
-    
-    # Retirement contribution tips
-    if "Retirement Contributions" not in deductions:
-        if income > 100000:
-            tips.append("💰 High Income Tip: Maximize your retirement contributions with a SEP IRA or Solo 401(k) to reduce taxable income by up to $69,000")
-        else:
-            tips.append("💡 Consider contributing to a retirement account (Traditional IRA: $7,000 limit) to reduce taxable income")
-    
-    # Home office deduction tip
-    if "Home Office" not in deductions:
-        tips.append("🏠 If you work from home, you may be eligible for the home office deduction - typically 10-20% of home expenses")
+    # Single pass over deductions to build the presence bitmap
+    present = 0
+    for deduction in deductions:
+        present |= _DEDUCTION_BITS.get(deduction, 0)
     
-    # Health insurance tip
-    if "Health Insurance" not in deductions:
-        tips.append("🏥 Self-employed individuals can deduct 100% of health insurance premiums for themselves and family")
+    # Expenses are only summed when the ratio is defined
+    expense_ratio = expense_amounts.sum() / income if income > 0 else 0
+    if expense_ratio >= 0.2:
+        present |= _BIT_EXPENSES_TRACKED
     
-    # Business expense tips
-    if expense_ratio < 0.2:  # If expenses are less than 20% of income
-        tips.append("📊 Your expense ratio seems low. Consider tracking all eligible business expenses including:")
-        tips.append("   • Software subscriptions and tools")
-        tips.append("   • Professional development and training")
-        tips.append("   • Office supplies and equipment")
-    
-    # High income tips
-    if income > 100000:
-        tips.append("💼 Consider forming an S-Corporation to potentially reduce self-employment tax")
-        if "Professional Services" not in deductions:
-            tips.append("⚖️ At your income level, consulting with a tax professional could lead to significant savings")
-    
-    # Quarterly tax payment tips
-    tips.append("📅 Remember to make quarterly estimated tax payments to avoid penalties")
-    
-    # Education and marketing tips
-    if "Professional Development" not in deductions:
-        tips.append("📚 Educational expenses related to maintaining or improving your skills are tax-deductible")
-    
-    if "Marketing & Advertising" not in deductions:
-        tips.append("📣 Marketing and advertising costs are fully deductible business expenses")
-    
-    return tips
+    tips = _TIPS_HIGH_INCOME if income > 100000 else _TIPS_LOW_INCOME
+    return [message for bit, message in tips if not present & bit]
 
-def calculate_monthly_goal(annual_goal: float, tax_rate: float) -> dict:
+class MonthlyGoal(NamedTuple):
+    monthly_before_tax: float
+    monthly_after_tax: float
+    tax_amount: float
+
+def calculate_monthly_goal(annual_goal: float, tax_rate: float) -> MonthlyGoal:
     """
     Calculate monthly income needed to reach annual goal after taxes
     """
@@ -122,107 +270,250 @@ def calculate_monthly_goal(annual_goal: float, tax_rate: float) -> dict:
     tax_amount = monthly_before_tax * tax_rate
     monthly_after_tax = monthly_before_tax - tax_amount
     
-    return {
-        "monthly_before_tax": monthly_before_tax,
-        "monthly_after_tax": monthly_after_tax,
-        "tax_amount": tax_amount
-    }
+    return MonthlyGoal(monthly_before_tax, monthly_after_tax, tax_amount)
+
+class RetirementImpact(NamedTuple):
+    future_value: float
+    tax_savings: float
+    total_contribution: float
 
-def calculate_retirement_impact(amount: float, years: int, rate: float = 0.07) -> dict:
+@lru_cache(maxsize=1024)
+def calculate_retirement_impact(amount: float, years: int, rate: float = 0.07) -> RetirementImpact:
     """
     Calculate the impact of retirement savings over time
     """
-    future_value = amount * ((1 + rate) ** years)
+    future_value = amount * _growth_factor(rate, years)
     tax_savings = amount * 0.22  # Assuming 22% tax bracket
     
-    return {
-        "future_value": future_value,
-        "tax_savings": tax_savings,
-        "total_contribution": amount * years
-    }
+    return RetirementImpact(future_value, tax_savings, amount * years)
 
-def adjust_for_inflation(amount: float, years: int, inflation_rate: float = 0.03) -> float:
+@lru_cache(maxsize=1024)
+def adjust_for_inflation(amount: float, years: int, inflation_rate: float = INFLATION_RATE) -> float:
     """
     Adjust amount for inflation over specified years
     """
-    return amount * ((1 + inflation_rate) ** years)
+    return amount * _growth_factor(inflation_rate, years)
+
+class FullReport(NamedTuple):
+    tax: float
+    quarterly_amount: float
+    monthly_before_tax: float
+    monthly_after_tax: float
+    monthly_tax: float
+
+def compute_full_report(
+    income: float,
+    goal: float,
+    tax_rate: float = 0.25,
+    country: str = "United States"
+) -> FullReport:
+    """
+    Calculate annual tax, the quarterly payment and the monthly goal breakdown in one call
+    """
+    tax = calculate_tax(income, country)
+    return FullReport(tax, tax / 4, *calculate_monthly_goal(goal, tax_rate))
+
+def _cache_data(**cache_kwargs):
+    """
+    Apply st.cache_data on the first call instead of at import time
+    """
+    def decorator(func):
+        cached_func = None
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal cached_func
+            if cached_func is None:
+                import streamlit as st
+                cached_func = st.cache_data(**cache_kwargs)(func)
+            return cached_func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@lru_cache(maxsize=1)
+def _http_session():
+    """
+    Shared HTTP session so refreshes reuse pooled connections instead of new TLS handshakes
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
+
+# ExchangeRate-API key, read from st.secrets on first use
+_API_KEY = None
+_RATES_URL_TEMPLATE = "https://v6.exchangerate-api.com/v6/%s/latest/%s"
+
+# Exchange rates are also kept on disk so restarts and new workers skip the API call
+_RATES_CACHE_TTL = 3600
+
+def _rates_cache_path(base_currency: str) -> Path:
+    # Per-user directory, so other local users cannot plant rates for the app to trust.
+    # Resolved on each call so importing utils never needs a home directory
+    # (Path.home() raises RuntimeError when there is none)
+    cache_home = os.environ.get("XDG_CACHE_HOME", "")
+    cache_dir = Path(cache_home) if os.path.isabs(cache_home) else Path.home() / ".cache"
+    return cache_dir / "freelancer-tax-estimator" / f"fx_{base_currency}.json"
+
+def _is_rates_dict(rates) -> bool:
+    return isinstance(rates, dict) and all(currency in rates for currency in _CCY_INDEX) and all(
+        isinstance(currency, str) and isinstance(rate, (int, float)) and not isinstance(rate, bool)
+        for currency, rate in rates.items()
+    )
+
+def _load_cached_rates(base_currency: str) -> Optional[Dict[str, float]]:
+    """
+    Read exchange rates saved to disk within the last hour, if any
+    """
+    try:
+        if time.time() - _rates_cache_path(base_currency).stat().st_mtime >= _RATES_CACHE_TTL:
+            return None
+    except (OSError, RuntimeError):
+        return None
+    entry = _load_stale_entry(base_currency)
+    return entry["rates"] if entry is not None else None
+
+def _load_stale_entry(base_currency: str) -> Optional[dict]:
+    """
+    Read the saved exchange rates with their ETag/Last-Modified validators, however old
+    """
+    try:
+        entry = json.loads(_rates_cache_path(base_currency).read_text())
+    except (OSError, RuntimeError, ValueError):
+        return None
+    return entry if isinstance(entry, dict) and _is_rates_dict(entry.get("rates")) else None
+
+def _save_cached_rates(base_currency: str, rates: Dict[str, float],
+                       etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+    """
+    Save exchange rates to disk, replacing the previous copy atomically
+    """
+    entry = {"rates": rates, "etag": etag, "last_modified": last_modified}
+    try:
+        path = _rates_cache_path(base_currency)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps(entry))
+        os.replace(tmp_path, path)
+    except (OSError, RuntimeError):
+        pass
+
+def _touch_cached_rates(base_currency: str) -> None:
+    """
+    Restart the disk cache TTL for rates the API reported as unchanged
+    """
+    try:
+        os.utime(_rates_cache_path(base_currency))
+    except (OSError, RuntimeError):
+        pass
 
 # Cache the exchange rates for 1 hour to avoid excessive API calls
-@st.cache_data(ttl=3600)
+# (in memory here, on disk via _load_cached_rates/_save_cached_rates)
+@_cache_data(ttl=3600)
 def get_exchange_rates(base_currency: str = "USD") -> Dict[str, float]:
     """
     Get real-time exchange rates from ExchangeRate-API
     Documentation: https://www.exchangerate-api.com/docs
     """
+    global _API_KEY
+    import streamlit as st
+    
+    cached_rates = _load_cached_rates(base_currency)
+    if cached_rates is not None:
+        return cached_rates
+    
     try:
         # Replace with your API key from https://www.exchangerate-api.com/
-        API_KEY = st.secrets["EXCHANGE_RATE_API_KEY"]
-        url = f"https://v6.exchangerate-api.com/v6/{API_KEY}/latest/{base_currency}"
+        if _API_KEY is None:
+            _API_KEY = st.secrets["EXCHANGE_RATE_API_KEY"]
+        url = _RATES_URL_TEMPLATE % (_API_KEY, base_currency)
         
-        response = requests.get(url)
+        # Revalidate an expired disk copy so unchanged rates come back as an empty 304
+        stale = _load_stale_entry(base_currency)
+        headers = {}
+        if stale is not None:
+            if stale.get("etag"):
+                headers["If-None-Match"] = stale["etag"]
+            if stale.get("last_modified"):
+                headers["If-Modified-Since"] = stale["last_modified"]
+        
+        response = _http_session().get(url, headers=headers, timeout=2.0)
+        if response.status_code == 304 and stale is not None:
+            _touch_cached_rates(base_currency)
+            return stale["rates"]
         response.raise_for_status()  # Raise an exception for bad status codes
         
         data = response.json()
-        if data["result"] == "success":
-            return data["conversion_rates"]
+        # Only complete rate tables are cached or returned; anything else falls back
+        if data["result"] == "success" and _is_rates_dict(data.get("conversion_rates")):
+            rates = data["conversion_rates"]
+            _save_cached_rates(base_currency, rates,
+                               response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return rates
         else:
             raise Exception("Failed to fetch exchange rates")
             
     except Exception as e:
         st.warning(f"⚠️ Could not fetch real-time exchange rates: {str(e)}. Using fallback rates.")
-        # Fallback to static rates if API fails
-        return CURRENCY_RATES
+        # Fallback to static rates if API fails (as a plain dict so st.cache_data can pickle it)
+        return dict(CURRENCY_RATES)
 
-# Fallback currency rates (used when API is unavailable)
-CURRENCY_RATES = {
-    "USD": 1.0,
-    "EUR": 0.92,
-    "GBP": 0.79,
-    "CAD": 1.35,
-    "AUD": 1.52,
-    "JPY": 151.50,
-    "CHF": 0.90,
-    "NZD": 1.65,
-    "CNY": 7.23,
-    "INR": 83.34
-}
+# Integer ids for the supported currencies, indexing the cross-rate tables
+_CCY_INDEX = {currency: i for i, currency in enumerate(CURRENCY_RATES)}
 
-def convert_currency(amount: float, from_currency: str, to_currency: str) -> float:
+def _cross_rate_table(rates: Dict[str, float]) -> np.ndarray:
     """
-    Convert amount between currencies using real-time exchange rates
+    Build the table of multipliers converting [from_id] -> [to_id] from USD-quoted rates
     """
-    if from_currency == to_currency:
-        return amount
-        
+    usd_rates = np.array([rates[currency] for currency in _CCY_INDEX], dtype=np.float64)
+    return np.outer(1.0 / usd_rates, usd_rates)
+
+# Cross rates from the fallback table
+_CROSS = _cross_rate_table(CURRENCY_RATES)
+
+@lru_cache(maxsize=1)
+def _cross_rates_for(usd_rates: tuple) -> np.ndarray:
+    table = _cross_rate_table(dict(zip(_CCY_INDEX, usd_rates)))
+    table.flags.writeable = False  # shared between callers through the cache
+    return table
+
+def get_cross_rates() -> np.ndarray:
+    """
+    Get the cross-rate table built from real-time exchange rates
+    """
+    # Rebuilt only when get_exchange_rates returns different rates for the supported currencies
+    rates = get_exchange_rates(base_currency="USD")
+    return _cross_rates_for(tuple(rates[currency] for currency in _CCY_INDEX))
+
+def _current_cross_rates() -> np.ndarray:
     try:
-        # Get real-time rates
-        rates = get_exchange_rates(base_currency="USD")
-        
-        # Convert to USD first (if not already in USD)
-        if from_currency != "USD":
-            amount_usd = amount / rates[from_currency]
-        else:
-            amount_usd = amount
-            
-        # Convert from USD to target currency
-        if to_currency != "USD":
-            final_amount = amount_usd * rates[to_currency]
-        else:
-            final_amount = amount_usd
-            
-        return final_amount
-        
+        return get_cross_rates()
     except Exception as e:
+        import streamlit as st
         st.warning(f"⚠️ Error in currency conversion: {str(e)}. Using fallback rates.")
         # Fallback to static rates if conversion fails
-        if from_currency != "USD":
-            amount_usd = amount / CURRENCY_RATES[from_currency]
-        else:
-            amount_usd = amount
-            
-        if to_currency != "USD":
-            final_amount = amount_usd * CURRENCY_RATES[to_currency]
-        else:
-            final_amount = amount_usd
-            
-        return final_amount 
\ No newline at end of file
+        return _CROSS
+
+def get_rate(from_currency: str, to_currency: str) -> float:
+    """
+    Get the multiplier converting amounts between currencies using real-time exchange rates
+    """
+    if from_currency == to_currency:
+        return 1.0
+    return float(_current_cross_rates()[_CCY_INDEX[from_currency], _CCY_INDEX[to_currency]])
+
+def convert_currency(amount: float, from_currency: str, to_currency: str) -> float:
+    """
+    Convert amount between currencies using real-time exchange rates
+    """
+    return amount * get_rate(from_currency, to_currency)
+
+def convert_currency_batch(amounts: np.ndarray, from_currency: str, to_currencies: list) -> np.ndarray:
+    """
+    Convert an array of amounts into several currencies at once
+    Returns an array of shape (len(amounts), len(to_currencies))
+    """
+    rates = _current_cross_rates()[_CCY_INDEX[from_currency], [_CCY_INDEX[c] for c in to_currencies]]
+    return np.asarray(amounts, dtype=np.float64)[:, None] * rates[None, :]